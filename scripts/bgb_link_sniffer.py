@@ -16,12 +16,17 @@ Default: Listen on 5000, forward to localhost:5001
 """
 
 import argparse
+import os
+import queue
+import selectors
 import signal
 import socket
 import struct
 import sys
 import threading
+import time
 from datetime import datetime
+from typing import Callable, Iterator
 
 # BGB protocol commands
 COMMANDS = {
@@ -40,83 +45,213 @@ STATUS_FLAGS = {
     0x04: "SUPPORT_RECONNECT",
 }
 
+# Lookup tables indexed directly by the command byte and by the STATUS flag
+# bits, used to prebuild the FORMATTERS labels and flag texts once at import.
+CMD_NAMES: tuple[str, ...] = tuple(
+    COMMANDS.get(cmd, f"UNKNOWN({cmd})") for cmd in range(256)
+)
+STATUS_FLAG_LISTS: tuple[tuple[str, ...], ...] = tuple(
+    tuple(name for bit, name in STATUS_FLAGS.items() if bits & bit) or ("NONE",)
+    for bits in range(8)
+)
+_STATUS_FLAG_MASK = 0x07
+
+PACKET_SIZE = 8
+# recv() already returns everything queued on the socket, so forwarding once
+# per read coalesces a burst into a single send. The buffer is sized so that
+# even a large backlog (8192 packets) goes out in one sendall() call.
+RECV_SIZE = 65536
+
+# Kernel send/receive buffer size for the proxied sockets, large enough to
+# absorb a burst without the TCP window collapsing.
+SOCKET_BUFFER_SIZE = 256 * 1024
+
+# The log writer flushes after this many lines, after this many seconds of
+# quiet, or immediately for messages that mark a connection state change.
+LOG_FLUSH_LINES = 128
+LOG_FLUSH_INTERVAL = 0.1
+_FLUSH_NOW_PREFIXES = ("Connection", "Forward error", "Failed to connect")
+
+# Every BGB packet is four command/data bytes followed by a little-endian u32.
+_PACKET = struct.Struct("<BBBBI")
+
+
+def unpack_batch(
+    data: bytes | bytearray,
+) -> Iterator[tuple[int, int, int, int, int, str]]:
+    """Yield `(b1, b2, b3, b4, i1, raw_hex)` for each complete packet in `data`.
+
+    The fields of the whole batch are unpacked in a single `iter_unpack`
+    pass and the raw bytes are hex-encoded once. Trailing bytes that do not
+    form a full packet are ignored.
+    """
+    end = len(data) - len(data) % PACKET_SIZE
+    view = memoryview(data)[:end]
+    raw = view.hex()
+    width = PACKET_SIZE * 2
+    for off, (b1, b2, b3, b4, i1) in zip(
+        range(0, len(raw), width), _PACKET.iter_unpack(view)
+    ):
+        yield b1, b2, b3, b4, i1, raw[off : off + width]
+
+
+def _sync3_details(b2: int, i1: int) -> str:
+    if b2 == 0 and i1 != 0:
+        return f" ts={i1} type=timestamp_sync"
+    if b2 == 1:
+        return " type=ack"
+    return " type=unknown"
+
+
+def _build_formatters() -> list[Callable[[int, int, int, int], str]]:
+    """Build a 256-entry table of packet summary formatters indexed by command.
+
+    Each entry renders the padded command name plus that command's details
+    straight from the unpacked fields `(b2, b3, b4, i1)`, so the per-packet
+    path needs neither a decoded dict nor checks for which details apply.
+    """
+    labels = [f"{name:15}" for name in CMD_NAMES]
+    flag_texts = [",".join(flags) for flags in STATUS_FLAG_LISTS]
+    table: list[Callable[[int, int, int, int], str]] = [
+        lambda b2, b3, b4, i1, label=label: label for label in labels
+    ]
+
+    version, sync1, sync2 = labels[1], labels[104], labels[105]
+    sync3, status = labels[106], labels[108]
+    table[1] = lambda b2, b3, b4, i1: f"{version} ver={b2}.{b3}.{b4}"
+    table[104] = lambda b2, b3, b4, i1: (
+        f"{sync1} data=0x{b2:02X} ctrl=0x{b3:02X} ts={i1} "
+        f"{'MASTER' if b3 & 0x01 else 'SLAVE'}"
+    )
+    table[105] = lambda b2, b3, b4, i1: f"{sync2} data=0x{b2:02X} ctrl=0x{b3:02X}"
+    table[106] = lambda b2, b3, b4, i1: sync3 + _sync3_details(b2, i1)
+    table[108] = lambda b2, b3, b4, i1: (
+        f"{status} flags={flag_texts[b2 & _STATUS_FLAG_MASK]}"
+    )
+    return table
+
+
+FORMATTERS = _build_formatters()
 
-def decode_packet(data: bytes) -> dict:
-    """Decode an 8-byte BGB packet."""
-    if len(data) < 8:
-        return {"error": f"Short packet: {len(data)} bytes", "raw": data.hex()}
-
-    b1, b2, b3, b4 = data[0], data[1], data[2], data[3]
-    i1 = struct.unpack("<I", data[4:8])[0]
-
-    result = {
-        "cmd": b1,
-        "cmd_name": COMMANDS.get(b1, f"UNKNOWN({b1})"),
-        "b2": b2,
-        "b3": b3,
-        "b4": b4,
-        "i1": i1,
-        "raw": data.hex(),
-    }
-
-    # Add command-specific interpretation
-    if b1 == 1:  # VERSION
-        result["version"] = f"{b2}.{b3}.{b4}"
-    elif b1 == 104:  # SYNC1
-        result["data"] = f"0x{b2:02X}"
-        result["control"] = f"0x{b3:02X}"
-        result["timestamp"] = i1
-        result["is_master"] = (b3 & 0x01) != 0
-        result["high_speed"] = (b3 & 0x02) != 0
-        result["double_speed"] = (b3 & 0x04) != 0
-    elif b1 == 105:  # SYNC2
-        result["data"] = f"0x{b2:02X}"
-        result["control"] = f"0x{b3:02X}"
-    elif b1 == 106:  # SYNC3
-        if b2 == 0 and i1 != 0:
-            result["type"] = "timestamp_sync"
-            result["timestamp"] = i1
-        elif b2 == 1:
-            result["type"] = "ack"
-        else:
-            result["type"] = "unknown"
-    elif b1 == 108:  # STATUS
-        flags = []
-        for flag_val, flag_name in STATUS_FLAGS.items():
-            if b2 & flag_val:
-                flags.append(flag_name)
-        result["flags"] = flags if flags else ["NONE"]
-
-    return result
-
-
-def format_packet(packet: dict, direction: str) -> str:
-    """Format a decoded packet for display."""
-    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-    arrow = "->" if direction == "CLIENT" else "<-"
 
-    cmd_name = packet.get("cmd_name", "?")
-    details = []
+# (whole second, "HH:MM:SS") of the most recent log timestamp. Stored as a
+# single tuple so concurrent callers can read and replace it atomically.
+_clock_cache: tuple[int, str] = (-1, "")
 
-    if "version" in packet:
-        details.append(f"ver={packet['version']}")
-    if "data" in packet:
-        details.append(f"data={packet['data']}")
-    if "control" in packet:
-        details.append(f"ctrl={packet['control']}")
-    if "timestamp" in packet:
-        details.append(f"ts={packet['timestamp']}")
-    if "is_master" in packet:
-        details.append("MASTER" if packet["is_master"] else "SLAVE")
-    if "type" in packet:
-        details.append(f"type={packet['type']}")
-    if "flags" in packet:
-        details.append(f"flags={','.join(packet['flags'])}")
 
-    detail_str = " " + " ".join(details) if details else ""
-    raw = packet.get("raw", "")
+def _timestamp() -> str:
+    """Return the local wall-clock time as HH:MM:SS.mmm.
 
-    return f"[{timestamp}] {direction:6} {arrow} {cmd_name:15}{detail_str}  [{raw}]"
+    Packets arrive many times per second, so the HH:MM:SS part is only
+    rebuilt when the whole second changes.
+    """
+    global _clock_cache
+    now = time.time()
+    sec = int(now)
+    cached_sec, hms = _clock_cache
+    if sec != cached_sec:
+        hms = time.strftime("%H:%M:%S", time.localtime(sec))
+        _clock_cache = (sec, hms)
+    return f"{hms}.{int((now - sec) * 1000):03d}"
+
+
+def direction_tag(direction: str) -> str:
+    """Return the padded direction and arrow shown before each packet."""
+    arrow = "->" if direction == "CLIENT" else "<-"
+    return f"{direction:6} {arrow}"
+
+
+def _set_buffer_sizes(sock: socket.socket) -> None:
+    """Enlarge the kernel buffers of `sock`.
+
+    The receive window scale is negotiated during the handshake, so this
+    must be applied to the listening socket (accepted sockets inherit it)
+    and to outgoing sockets before they connect.
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+
+
+def _set_low_latency(sock: socket.socket) -> None:
+    """Send and acknowledge the small BGB packets without delay."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # Linux only. The kernel can fall back to delayed ACKs later, but this
+    # covers the handshake-time exchange of VERSION/STATUS packets.
+    if hasattr(socket, "TCP_QUICKACK"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+
+class _Stream:
+    """Forwarding state for one direction of a proxied connection."""
+
+    def __init__(self, src: socket.socket, dst: socket.socket, direction: str):
+        self.src = src
+        self.dst = dst
+        self.direction = direction
+        self.tag = direction_tag(direction)
+        # Only a partial packet (< 8 bytes) is ever carried between reads, so
+        # consuming decoded packets in place keeps the buffer tiny.
+        self.buffer = bytearray()
+        # (read end, write end) of the pipe used to splice() when relaying.
+        self.pipe: tuple[int, int] | None = None
+        # Bytes read from src that dst has not accepted yet, either here or
+        # (when splicing) still sitting in the pipe. src is not read again
+        # until they are flushed, so a peer that stops reading only holds up
+        # the direction sending to it.
+        self.outbox = bytearray()
+        self.piped = 0
+        self.eof = False
+        self.closed = False
+
+    @property
+    def backlogged(self) -> bool:
+        return bool(self.outbox or self.piped)
+
+
+def _send(stream: _Stream, data) -> None:
+    """Send `data` to `stream.dst`, queueing whatever it doesn't accept now."""
+    if not stream.outbox:
+        try:
+            sent = stream.dst.send(data)
+        except BlockingIOError:
+            sent = 0
+        data = data[sent:]
+    if data:
+        stream.outbox += data
+
+
+def _flush(stream: _Stream) -> None:
+    """Send as much of `stream`'s backlog as its destination accepts."""
+    if stream.piped:
+        pipe_read = stream.pipe[0]
+        dst_fd = stream.dst.fileno()
+        try:
+            while stream.piped:
+                stream.piped -= os.splice(pipe_read, dst_fd, stream.piped)
+        except BlockingIOError:
+            pass
+    elif stream.outbox:
+        try:
+            sent = stream.dst.send(stream.outbox)
+        except BlockingIOError:
+            return
+        del stream.outbox[:sent]
+
+
+def _watch(selector: selectors.BaseSelector, sock: socket.socket, events: int) -> None:
+    """Make `selector` wait for exactly `events` on `sock` (none if 0)."""
+    try:
+        current = selector.get_key(sock).events
+    except KeyError:
+        current = 0
+    if events == current:
+        return
+    if not events:
+        selector.unregister(sock)
+    elif not current:
+        selector.register(sock, events)
+    else:
+        selector.modify(sock, events)
 
 
 class LinkSniffer:
@@ -126,6 +261,7 @@ class LinkSniffer:
         forward_host: str,
         forward_port: int,
         out_file: str | None,
+        decode: bool = True,
     ):
         self.listen_port = listen_port
         self.forward_host = forward_host
@@ -134,12 +270,22 @@ class LinkSniffer:
         self._server_socket: socket.socket | None = None
         self.log_file = None
         self.out_file = out_file
-        self._log_lock = threading.Lock()
-        self._log_lines_since_flush = 0
+        self.decode = decode
+        # The forwarding loop only enqueues log lines; a single writer thread
+        # does the console/file I/O so it never stalls packet forwarding.
+        self._log_queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._log_thread: threading.Thread | None = None
+        # stop() writes to this pair to wake the connection's select loop.
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
 
     def stop(self):
         """Request all threads to stop and unblock blocking I/O."""
         self.running = False
+        try:
+            self._wakeup_send.send(b"\0")
+        except OSError:
+            pass
         if self._server_socket is not None:
             try:
                 self._server_socket.close()
@@ -154,10 +300,13 @@ class LinkSniffer:
         )
         self.log_file = open(log_filename, "w", encoding="utf-8")
         print(f"Logging to {log_filename}")
+        self._log_thread = threading.Thread(target=self._log_writer, daemon=True)
+        self._log_thread.start()
 
         server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._server_socket = server
         server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        _set_buffer_sizes(server)
         server.bind(("0.0.0.0", self.listen_port))
         server.listen(1)
         # Use a timeout so Ctrl-C/shutdown can break out of accept().
@@ -183,27 +332,54 @@ class LinkSniffer:
             server.close()
         except OSError:
             pass
-        if self.log_file:
-            self.log_file.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+        self._log_queue.put(None)
+        self._log_thread.join()
+        self.log_file.close()
+
+    def _drain_wakeup(self):
+        """Discard the bytes stop() wrote so the wakeup socket stops polling ready."""
+        try:
+            while self._wakeup_recv.recv(64):
+                pass
+        except OSError:
+            pass
 
     def log(self, message: str):
-        with self._log_lock:
-            print(message)
-            if self.log_file:
-                self.log_file.write(message + "\n")
-                self._log_lines_since_flush += 1
-                if (
-                    self._log_lines_since_flush >= 128
-                    or message.startswith("Connection")
-                    or message.startswith("Forward error")
-                    or message.startswith("Failed to connect")
-                ):
-                    self.log_file.flush()
-                    self._log_lines_since_flush = 0
+        self._log_queue.put(message)
+
+    def _log_writer(self):
+        """Drain queued log lines to stdout and the log file until stopped."""
+        pending = 0
+        while True:
+            try:
+                message = self._log_queue.get(timeout=LOG_FLUSH_INTERVAL)
+            except queue.Empty:
+                if pending:
+                    self._flush_log()
+                    pending = 0
+                continue
+            if message is None:
+                break
+
+            line = message + "\n"
+            sys.stdout.write(line)
+            self.log_file.write(line)
+            pending += 1
+            if pending >= LOG_FLUSH_LINES or message.startswith(_FLUSH_NOW_PREFIXES):
+                self._flush_log()
+                pending = 0
+        self._flush_log()
+
+    def _flush_log(self):
+        sys.stdout.flush()
+        self.log_file.flush()
 
     def handle_connection(self, client_sock: socket.socket):
         try:
             server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            _set_buffer_sizes(server_sock)
             server_sock.connect((self.forward_host, self.forward_port))
             self.log(f"Connected to server at {self.forward_host}:{self.forward_port}")
         except Exception as e:
@@ -211,59 +387,124 @@ class LinkSniffer:
             client_sock.close()
             return
 
-        client_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-        server_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-
-        # Use timeouts so forwarding threads can exit promptly on shutdown.
-        client_sock.settimeout(0.5)
-        server_sock.settimeout(0.5)
-
-        # Start forwarding threads
-        client_to_server = threading.Thread(
-            target=self.forward,
-            args=(client_sock, server_sock, "CLIENT"),
-            daemon=True,
+        _set_low_latency(client_sock)
+        _set_low_latency(server_sock)
+
+        # Both directions are serviced by one select loop on this thread;
+        # stop() wakes it through the wakeup socket instead of read timeouts.
+        # The sockets are non-blocking and unsent bytes wait for EVENT_WRITE,
+        # so neither direction can block the other.
+        client_sock.setblocking(False)
+        server_sock.setblocking(False)
+        streams = (
+            _Stream(client_sock, server_sock, "CLIENT"),
+            _Stream(server_sock, client_sock, "SERVER"),
         )
-        server_to_client = threading.Thread(
-            target=self.forward,
-            args=(server_sock, client_sock, "SERVER"),
-            daemon=True,
-        )
-
-        client_to_server.start()
-        server_to_client.start()
-
-        client_to_server.join()
-        server_to_client.join()
-
+        # Each socket is the source of one stream and the destination of the other.
+        peers = {
+            client_sock: (streams[0], streams[1]),
+            server_sock: (streams[1], streams[0]),
+        }
+        # Reused for every read so a busy link doesn't allocate per recv().
+        rx = memoryview(bytearray(RECV_SIZE))
+        pump = self.forward if self.decode else self.relay
+        if not self.decode and hasattr(os, "splice"):
+            for stream in streams:
+                stream.pipe = os.pipe()
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._wakeup_recv, selectors.EVENT_READ)
+
+            open_streams = len(streams)
+            while self.running and open_streams:
+                for sock, (reading, writing) in peers.items():
+                    events = 0
+                    if not reading.eof and not reading.backlogged:
+                        events |= selectors.EVENT_READ
+                    if writing.backlogged:
+                        events |= selectors.EVENT_WRITE
+                    _watch(selector, sock, events)
+
+                for key, events in selector.select():
+                    if key.fileobj is self._wakeup_recv:
+                        # Woken by stop(); the loop condition ends the session.
+                        self._drain_wakeup()
+                        continue
+                    reading, writing = peers[key.fileobj]
+                    # The direction being serviced, for the error message.
+                    stream = writing
+                    try:
+                        if events & selectors.EVENT_WRITE:
+                            _flush(writing)
+                        stream = reading
+                        if events & selectors.EVENT_READ and not pump(reading, rx):
+                            reading.eof = True
+                    except BlockingIOError:
+                        # Spurious readiness; select again.
+                        pass
+                    except Exception as e:
+                        self.log(f"Forward error ({stream.direction}): {e}")
+                        open_streams = 0
+                        break
+
+                for stream in streams:
+                    finished = stream.eof and not stream.backlogged
+                    if open_streams and finished and not stream.closed:
+                        # Pass the EOF on so the other peer sees the half-close.
+                        try:
+                            stream.dst.shutdown(socket.SHUT_WR)
+                        except OSError:
+                            pass
+                        stream.closed = True
+                        open_streams -= 1
+
+        for stream in streams:
+            if stream.pipe is not None:
+                os.close(stream.pipe[0])
+                os.close(stream.pipe[1])
         client_sock.close()
         server_sock.close()
         self.log("Connection closed")
 
-    def forward(self, src: socket.socket, dst: socket.socket, direction: str):
-        buffer = b""
-        try:
-            while self.running:
-                try:
-                    data = src.recv(4096)
-                except socket.timeout:
-                    continue
-                if not data:
-                    break
-
-                # Forward first to avoid proxy-induced timing skew under heavy traffic.
-                dst.sendall(data)
-                buffer += data
-
-                # Process complete 8-byte packets
-                while len(buffer) >= 8:
-                    packet_data = buffer[:8]
-                    buffer = buffer[8:]
-
-                    packet = decode_packet(packet_data)
-                    self.log(format_packet(packet, direction))
-        except Exception as e:
-            self.log(f"Forward error ({direction}): {e}")
+    def forward(self, stream: _Stream, rx: memoryview) -> bool:
+        """Forward and log one read from `stream`; return False at EOF."""
+        n = stream.src.recv_into(rx)
+        if not n:
+            return False
+        data = rx[:n]
+
+        # Forward first to avoid proxy-induced timing skew under heavy traffic.
+        _send(stream, data)
+        buffer = stream.buffer
+        buffer.extend(data)
+
+        # Decode all complete packets received so far in one batch.
+        complete = len(buffer) - len(buffer) % PACKET_SIZE
+        if complete:
+            tag = stream.tag
+            for b1, b2, b3, b4, i1, raw in unpack_batch(buffer):
+                summary = FORMATTERS[b1](b2, b3, b4, i1)
+                self.log(f"[{_timestamp()}] {tag} {summary}  [{raw}]")
+            del buffer[:complete]
+        return True
+
+    def relay(self, stream: _Stream, rx: memoryview) -> bool:
+        """Forward one read from `stream` without decoding; return False at EOF."""
+        if stream.pipe is None:
+            n = stream.src.recv_into(rx)
+            if not n:
+                return False
+            _send(stream, rx[:n])
+            return True
+
+        # On Linux, splice() moves the bytes socket -> pipe -> socket inside
+        # the kernel, so they are never copied into this process. The pipe is
+        # empty here (src isn't read while backlogged), so this can't block.
+        stream.piped = os.splice(stream.src.fileno(), stream.pipe[1], RECV_SIZE)
+        if not stream.piped:
+            return False
+        _flush(stream)
+        return True
 
 
 def main():
@@ -297,6 +538,14 @@ def main():
         help="Optional log file path. Defaults to bgb_trace_YYYYmmdd_HHMMSS.log",
     )
 
+    parser.add_argument(
+        "--no-decode",
+        dest="decode",
+        action="store_false",
+        help="Forward traffic without decoding or logging packets "
+        "(connection events are still logged)",
+    )
+
     args = parser.parse_args()
     listen_port = args.listen_port
     forward_host = args.forward_host
@@ -311,7 +560,9 @@ def main():
     print(f"  3. Start BGB #2: Link -> Connect to localhost:{listen_port}")
     print()
 
-    sniffer = LinkSniffer(listen_port, forward_host, forward_port, args.out_file)
+    sniffer = LinkSniffer(
+        listen_port, forward_host, forward_port, args.out_file, args.decode
+    )
 
     def _handle_sigint(_signum, _frame):
         sniffer.stop()
@@ -23,22 +23,151 @@ from datetime import datetime
 from pathlib import Path
 import json
 import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+# blake3 (optional, `pip install blake3`) hashes several times faster than
+# SHA-256 on CPUs without SHA extensions. Digests are only compared with each
+# other to spot duplicate files, so either hash works.
+try:
+    from blake3 import blake3 as new_content_hash
+except ImportError:
+    new_content_hash = hashlib.sha256
+
+# Package directories are scanned concurrently; the work is almost entirely
+# directory I/O, so threads overlap it well despite the GIL.
+SCAN_WORKERS = 8
+
+# Matches NOTICE, NOTICE.txt, notice.md, ... but not NOTICES or NOTICEBOARD.
+NOTICE_RE = re.compile(r"^NOTICE(\b|\.|$)", re.IGNORECASE)
+
 
 def find_notice_files(root: Path) -> list[Path]:
-    pattern = re.compile(r"^NOTICE(\b|\.|$)", re.IGNORECASE)
     matches: list[Path] = []
 
-    for dirpath, dirnames, filenames in os.walk(root):
-        for fname in filenames:
-            if pattern.match(fname):
-                matches.append(Path(dirpath) / fname)
+    # os.scandir reports file/dir types from the directory listing itself,
+    # avoiding the extra stat() per entry that os.walk needs. Hidden
+    # directories (.git, .cargo caches, ...) never hold package NOTICE files.
+    pending = [str(root)]
+    while pending:
+        dirpath = pending.pop()
+        try:
+            entries = os.scandir(dirpath)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith("."):
+                            pending.append(entry.path)
+                        continue
+                    name = entry.name
+                    # Most names don't start with N, so a one-character check
+                    # keeps the regex off the bulk of entries.
+                    if name[0] in "Nn" and NOTICE_RE.match(name) and entry.is_file():
+                        matches.append(Path(entry.path))
+                except OSError:
+                    continue
 
     return sorted(matches)
 
 
-def cargo_metadata_repo_packages(repo_root: Path, verbose: bool = False) -> Optional[dict]:
+def metadata_cache_path(repo_root: Path) -> Optional[Path]:
+    """Return where `cargo metadata` output for the current manifests is cached.
+
+    The metadata only changes when the lockfile, a workspace manifest, or
+    the cargo home (which appears in every manifest path) changes, so those
+    are hashed into the cache file name. Returns None without a Cargo.lock.
+    """
+    lockfile = repo_root / "Cargo.lock"
+    if not lockfile.exists():
+        return None
+
+    h = hashlib.sha256()
+    manifests = [lockfile, repo_root / "Cargo.toml"]
+    manifests += sorted(repo_root.glob("crates/*/Cargo.toml"))
+    for manifest in manifests:
+        try:
+            h.update(manifest.read_bytes())
+        except OSError:
+            continue
+    h.update(os.environ.get("CARGO_HOME", str(Path.home() / ".cargo")).encode())
+    return repo_root / "target" / ".notice-cache" / f"{h.hexdigest()}.json"
+
+
+def cargo_metadata_repo_packages(
+    repo_root: Path, verbose: bool = False, use_cache: bool = True
+) -> Optional[dict]:
+    cache_path = metadata_cache_path(repo_root) if use_cache else None
+    data = None
+    if cache_path is not None and cache_path.exists():
+        if verbose:
+            print(f"Using cached cargo metadata: {cache_path}")
+        data = load_cached_metadata(cache_path, verbose=verbose)
+
+    if data is None:
+        raw = run_cargo_metadata(repo_root, verbose=verbose)
+        if raw is None:
+            return None
+        try:
+            data = json.loads(raw)
+        except Exception as e:
+            if verbose:
+                print(f"failed to parse cargo metadata output: {e}; skipping")
+            return None
+        if cache_path is not None:
+            save_cached_metadata(cache_path, raw, verbose=verbose)
+
+    if verbose:
+        names = [f"{p.get('name')}-{p.get('version')}" for p in data.get('packages', [])]
+        print(f"cargo metadata returned {len(names)} packages (showing up to 40):")
+        print(" ", ", ".join(names[:40]))
+    return data
+
+
+def load_cached_metadata(cache_path: Path, verbose: bool = False) -> Optional[dict]:
+    """Return the cached metadata, or None (removing the file) if it is unusable."""
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError("not a JSON object")
+        return data
+    except (OSError, ValueError) as e:
+        # A corrupt cache would otherwise hide every external package, since
+        # it is never rewritten while it exists.
+        if verbose:
+            print(f"discarding unreadable cargo metadata cache ({e})")
+        cache_path.unlink(missing_ok=True)
+        return None
+
+
+def save_cached_metadata(cache_path: Path, raw: str, verbose: bool = False) -> None:
+    # Written to a temporary sibling first so an interrupted run can't leave
+    # a truncated cache behind.
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(raw, encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        if verbose:
+            print(f"could not cache cargo metadata: {e}")
+        return
+
+    # Entries for older manifests are never looked up again, so only the
+    # current one is kept.
+    for stale in cache_path.parent.glob("*.json"):
+        if stale != cache_path:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def run_cargo_metadata(repo_root: Path, verbose: bool = False) -> Optional[str]:
     try:
         if verbose:
             print("Running: cargo metadata --format-version 1")
@@ -58,21 +187,12 @@ def cargo_metadata_repo_packages(repo_root: Path, verbose: bool = False) -> Opti
             print(f"cargo metadata failed: {e}; stderr: {e.stderr}")
         return None
 
-    try:
-        data = json.loads(proc.stdout)
-        if verbose:
-            names = [f"{p.get('name')}-{p.get('version')}" for p in data.get('packages', [])]
-            print(f"cargo metadata returned {len(names)} packages (showing up to 40):")
-            print(" ", ", ".join(names[:40]))
-    except Exception as e:
-        if verbose:
-            print(f"failed to parse cargo metadata output: {e}; skipping")
-        return None
+    return proc.stdout
 
-    return data
 
-
-def find_external_package_dirs(repo_root: Path, verbose: bool = False) -> list[Path]:
+def find_external_package_dirs(
+    repo_root: Path, verbose: bool = False, use_cache: bool = True
+) -> list[Path]:
     """Return a list of external package source directories to scan for NOTICE files.
 
     This checks `cargo metadata`, and for each package whose manifest path is
@@ -80,7 +200,7 @@ def find_external_package_dirs(repo_root: Path, verbose: bool = False) -> list[P
     registry cache (~/.cargo/registry/src/*/<name>-<version>). Git/checkouts are
     ignored unless they appear under the registry layout.
     """
-    data = cargo_metadata_repo_packages(repo_root, verbose=verbose)
+    data = cargo_metadata_repo_packages(repo_root, verbose=verbose, use_cache=use_cache)
     if not data:
         return []
 
@@ -139,12 +259,79 @@ def find_external_package_dirs(repo_root: Path, verbose: bool = False) -> list[P
     return unique
 
 
-def sha256_of(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
+def digest_of(path: Path) -> str:
+    # NOTICE files are a few KB, so hashing them in one read is cheaper than
+    # setting up a chunked loop.
+    return new_content_hash(path.read_bytes()).hexdigest()
+
+
+def dedupe_by_content(paths: list[Path]) -> list[Path]:
+    """Return `paths` in order, dropping files identical to an earlier one.
+
+    Files can only be identical if they have the same size, so candidates are
+    bucketed by size first and only files sharing a bucket get hashed. Most
+    NOTICE files have a unique size and are never read here at all.
+    """
+    sizes: dict[Path, Optional[int]] = {}
+    for p in paths:
+        try:
+            sizes[p] = p.stat().st_size
+        except OSError:
+            sizes[p] = None
+    bucket_sizes = Counter(size for size in sizes.values() if size is not None)
+
+    seen: set[tuple[int, str]] = set()
+    unique: list[Path] = []
+    for p in paths:
+        size = sizes[p]
+        if size is None or bucket_sizes[size] == 1:
+            unique.append(p)
+            continue
+
+        try:
+            key = (size, digest_of(p))
+        except Exception as e:
+            print(f"Warning: could not hash {p}: {e}")
+            unique.append(p)
+            continue
+
+        if key in seen:
+            print(f"Skipping duplicate: {p}")
+            continue
+        seen.add(key)
+        unique.append(p)
+
+    return unique
+
+
+def write_notice(
+    out_path: Path, header: list[str], files: list[Path], repo_root: Path
+) -> None:
+    """Write the header and each file's text to `out_path`, one file at a time.
+
+    Only one NOTICE file is held in memory at once. The output goes to a
+    temporary sibling that replaces `out_path` once complete, so a failure
+    midway never leaves a truncated NOTICE behind.
+    """
+    # Hidden, so a file left behind by a killed run is never picked up by
+    # find_notice_files (which NOTICE.tmp would match).
+    tmp_path = out_path.with_name(f".{out_path.name}.tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as out:
+            out.write("\n".join(header))
+            for p in files:
+                rel = os.path.relpath(p, repo_root)
+                try:
+                    text = p.read_text(encoding="utf-8")
+                except Exception:
+                    text = p.read_text(encoding="latin-1")
+                out.write(f"\n---- Source: {rel} ----\n")
+                out.write(text)
+                out.write("\n\n")
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 def make_backup(path: Path) -> Path:
@@ -159,6 +346,11 @@ def main(argv: list[str] | None = None) -> int:
     parser.add_argument("--out", "-o", default="NOTICE", help="Output NOTICE file name (default: NOTICE)")
     parser.add_argument("--overwrite", "-f", action="store_true", help="Overwrite existing NOTICE without backup")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose debug output")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always run cargo metadata instead of reusing output cached under target/",
+    )
     args = parser.parse_args(argv)
 
     script_dir = Path(__file__).resolve().parent
@@ -172,13 +364,16 @@ def main(argv: list[str] | None = None) -> int:
 
     # Also scan non-vendored dependencies discovered via cargo metadata
     try:
-        external_dirs = find_external_package_dirs(repo_root, verbose=verbose)
+        external_dirs = find_external_package_dirs(
+            repo_root, verbose=verbose, use_cache=not args.no_cache
+        )
     except Exception as e:
         print(f"Warning: error locating external package dirs: {e}")
         external_dirs = []
 
-    for d in external_dirs:
-        candidates += find_notice_files(d)
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        for found in pool.map(find_notice_files, external_dirs):
+            candidates += found
 
     # Exclude target NOTICE file itself
     candidates = [p.resolve() for p in candidates if p.resolve() != out_path]
@@ -187,47 +382,21 @@ def main(argv: list[str] | None = None) -> int:
         print("No NOTICE files found. Not creating a NOTICE file.")
         return 0
 
-    seen: dict[str, bool] = {}
-    sections: list[str] = []
-
-    for p in candidates:
-        try:
-            key = sha256_of(p)
-        except Exception as e:
-            print(f"Warning: could not hash {p}: {e}")
-            key = None
-
-        if key and key in seen:
-            print(f"Skipping duplicate: {p}")
-            continue
-
-        if key:
-            seen[key] = True
-
-        rel = os.path.relpath(p, repo_root)
-        sections.append(f"---- Source: {rel} ----")
-        try:
-            text = p.read_text(encoding="utf-8")
-        except Exception:
-            text = p.read_text(encoding="latin-1")
-        sections.append(text)
-        sections.append("\n")
+    included = dedupe_by_content(candidates)
 
     header = [
         "Aggregated NOTICE file",
         f"Generated: {datetime.now().isoformat()}",
         "Included files:",
-        f"{len(seen)} files",
+        f"{len(included)} files",
         "",
     ]
 
-    content = "\n".join(header + sections)
-
     if out_path.exists() and not args.overwrite:
         bak = make_backup(out_path)
         print(f"Existing {out_path.name} backed up to: {bak}")
 
-    out_path.write_text(content, encoding="utf-8")
+    write_notice(out_path, header, included, repo_root)
     print(f"Wrote aggregated NOTICE to: {out_path}")
     return 0
 
@@ -15,6 +15,9 @@ The source image is expected to be a square PNG with transparency.
 from __future__ import annotations
 
 import argparse
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable
@@ -50,6 +53,9 @@ COMMON_PNG_SIZES: tuple[int, ...] = (
     512,
 )
 
+# Intermediate sizes the source is pre-scaled to before producing the outputs.
+PYRAMID_SIZES: tuple[int, ...] = (256, 128, 64)
+
 ICO_SIZES: tuple[int, ...] = (
     16,
     24,
@@ -87,29 +93,105 @@ def _resize_square(img: Image.Image, size_px: int) -> Image.Image:
     return img.resize((size_px, size_px), resample=Image.Resampling.LANCZOS)
 
 
+def _build_pyramid(source: Image.Image) -> dict[int, Image.Image]:
+    """Pre-scale the source to the intermediate sizes smaller than itself.
+
+    A Lanczos resize costs more the larger its input is, so small icons are
+    resized from the smallest intermediate that is still at least as large
+    as the target instead of from the full-resolution source.
+    """
+
+    pyramid = {source.width: source}
+    for size in PYRAMID_SIZES:
+        if size < source.width:
+            pyramid[size] = _resize_square(source, size)
+    return pyramid
+
+
+def _resize_from_pyramid(pyramid: dict[int, Image.Image], size_px: int) -> Image.Image:
+    """Resize to `size_px` from the closest pyramid level not below it."""
+
+    larger = [size for size in pyramid if size >= size_px]
+    base = pyramid[min(larger) if larger else max(pyramid)]
+    if base.width == size_px:
+        return base
+    return _resize_square(base, size_px)
+
+
 def _ensure_parent_dir(path: Path) -> None:
     """Create the parent directory for an output file if missing."""
 
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
-def write_pngs(source: Image.Image, outputs: Iterable[OutputPng]) -> None:
-    """Write a set of PNG outputs."""
+def resize_all(
+    source: Image.Image, sizes: Iterable[int]
+) -> dict[int, Image.Image]:
+    """Resize the source once for each distinct size."""
+
+    pyramid = _build_pyramid(source)
+    unique_sizes = sorted(set(sizes))
+
+    # Pillow releases the GIL while resampling, so sizes are produced in
+    # parallel. The pyramid images are only read.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        resized = pool.map(
+            lambda size: _resize_from_pyramid(pyramid, size), unique_sizes
+        )
+        return dict(zip(unique_sizes, resized))
+
+
+def _write_png(image: Image.Image, path: Path) -> None:
+    """Save a single PNG output."""
+
+    _ensure_parent_dir(path)
+    # These are regenerated build assets; fast zlib level 1 encoding matters
+    # more than the few KB a higher level would save.
+    image.save(path, format="PNG", compress_level=1, optimize=False)
+
 
+def write_pngs(
+    images: dict[int, Image.Image], outputs: Iterable[OutputPng]
+) -> None:
+    """Write a set of PNG outputs from the pre-resized images."""
+
+    # Outputs sharing a size are encoded once and copied, so no two workers
+    # ever save the same Image object concurrently.
+    paths_by_size: dict[int, list[Path]] = {}
     for out in outputs:
-        _ensure_parent_dir(out.path)
-        resized = _resize_square(source, out.size_px)
-        resized.save(out.path, format="PNG")
+        paths_by_size.setdefault(out.size_px, []).append(out.path)
+
+    def save(size: int) -> None:
+        first, *copies = paths_by_size[size]
+        _write_png(images[size], first)
+        for path in copies:
+            _ensure_parent_dir(path)
+            shutil.copyfile(first, path)
+
+    # PNG encoding also runs without the GIL, so sizes are saved in parallel.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        # Consume the results so an exception from any worker propagates.
+        for _ in pool.map(save, paths_by_size):
+            pass
 
 
-def write_ico(source: Image.Image, out_path: Path, sizes: tuple[int, ...]) -> None:
-    """Write a multi-resolution .ico from the given source image."""
+def write_ico(
+    images: dict[int, Image.Image], out_path: Path, sizes: tuple[int, ...]
+) -> None:
+    """Write a multi-resolution .ico from the pre-resized images."""
 
     _ensure_parent_dir(out_path)
 
-    # Pillow builds the ICO frames by resizing from the base image.
-    # Keeping a high-res source avoids artifacts in the larger sizes.
-    source.save(out_path, format="ICO", sizes=[(s, s) for s in sizes])
+    # Pillow uses a provided frame as-is when its size matches, instead of
+    # resampling the base image again. It skips sizes larger than the base,
+    # so the largest frame has to be the base.
+    frames = [images[s] for s in sorted(sizes, reverse=True)]
+    frames[0].save(
+        out_path,
+        format="ICO",
+        sizes=[(s, s) for s in sizes],
+        append_images=frames[1:],
+    )
 
 
 def build_outputs(repo_root: Path) -> tuple[list[OutputPng], Path]:
@@ -174,8 +256,11 @@ def main() -> int:
     source = _open_source(source_path)
     png_outputs, ico_path = build_outputs(repo_root)
 
-    write_pngs(source, png_outputs)
-    write_ico(source, ico_path, ICO_SIZES)
+    images = resize_all(
+        source, [out.size_px for out in png_outputs] + list(ICO_SIZES)
+    )
+    write_pngs(images, png_outputs)
+    write_ico(images, ico_path, ICO_SIZES)
 
     print(f"Wrote {len(png_outputs)} PNGs")
     print(f"Wrote ICO: {ico_path.relative_to(repo_root)}")
@@ -4,22 +4,36 @@ Update TEST_STATUS.md with the latest cargo test results (including ignored test
 """
 from __future__ import annotations
 
+import argparse
 import os
-import re
+import selectors
 import subprocess
 import sys
-from collections import Counter
+import threading
+from bisect import insort
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 TEST_STATUS_FILE = REPO_ROOT / "TEST_STATUS.md"
 TESTS_DIR = REPO_ROOT / "crates" / "vibe-emu-core" / "tests"
 
-TEST_RESULT_RE = re.compile(
-    r"^test\s+(?P<name>.+?)\s+\.\.\.\s+(?P<status>ok|FAILED|ignored|measured)(?:\s+\([^)]*\))?$"
-)
+# Serializes the output blocks of commands that finish on different threads.
+_PRINT_LOCK = threading.Lock()
+
+# Command output is read from the pipe in blocks of this size.
+READ_SIZE = 1 << 16
+
+# Status words cargo prints after `test <name> ... `, mapped to status keys.
+STATUS_KEYS = {
+    "ok": "passed",
+    "FAILED": "failed",
+    "ignored": "ignored",
+    "measured": "measured",
+}
 
 STATUS_DISPLAY = {
     "passed": "✅ Pass",
@@ -32,39 +46,33 @@ STATUS_DISPLAY = {
 STATUS_ORDER = {"passed": 0, "failed": 1, "ignored": 2, "measured": 3, "other": 4}
 
 
-@dataclass
+@dataclass(slots=True)
 class ModuleSummary:
     name: str
-    tests: List[Tuple[str, str]] = field(default_factory=list)  # (test_name, status_key)
-    counts: Counter = field(default_factory=Counter)
+    # (sort_order, test_name, status_key), kept in report order as tests
+    # are added.
+    tests: List[Tuple[int, str, str]] = field(default_factory=list)
+    passed: int = 0
+    failed: int = 0
+    ignored: int = 0
+    measured: int = 0
+    other: int = 0
+    total: int = 0
 
     def add(self, test_name: str, status_key: str) -> None:
-        self.tests.append((test_name, status_key))
-        self.counts[status_key] += 1
-
-    @property
-    def total(self) -> int:
-        return sum(self.counts.values())
-
-    @property
-    def passed(self) -> int:
-        return self.counts.get("passed", 0)
-
-    @property
-    def failed(self) -> int:
-        return self.counts.get("failed", 0)
-
-    @property
-    def ignored(self) -> int:
-        return self.counts.get("ignored", 0)
-
-    @property
-    def measured(self) -> int:
-        return self.counts.get("measured", 0)
-
-    @property
-    def other(self) -> int:
-        return self.counts.get("other", 0)
+        order = STATUS_ORDER.get(status_key, 99)
+        insort(self.tests, (order, test_name, status_key))
+        self.total += 1
+        if status_key == "passed":
+            self.passed += 1
+        elif status_key == "failed":
+            self.failed += 1
+        elif status_key == "ignored":
+            self.ignored += 1
+        elif status_key == "measured":
+            self.measured += 1
+        else:
+            self.other += 1
 
     @property
     def pass_percentage(self) -> float:
@@ -74,7 +82,7 @@ class ModuleSummary:
         return (self.passed / total) * 100.0
 
 
-@dataclass
+@dataclass(slots=True)
 class CategorySummary:
     name: str
     modules: Dict[str, ModuleSummary] = field(default_factory=dict)
@@ -84,11 +92,15 @@ class CategorySummary:
         module.add(test_name, status_key)
 
     @property
-    def counts(self) -> Counter:
-        total = Counter()
-        for module in self.modules.values():
-            total.update(module.counts)
-        return total
+    def counts(self) -> Dict[str, int]:
+        modules = self.modules.values()
+        return {
+            "passed": sum(module.passed for module in modules),
+            "failed": sum(module.failed for module in modules),
+            "ignored": sum(module.ignored for module in modules),
+            "measured": sum(module.measured for module in modules),
+            "other": sum(module.other for module in modules),
+        }
 
     @property
     def total(self) -> int:
@@ -103,12 +115,12 @@ class CategorySummary:
         return (passed / total) * 100.0
 
 
-@dataclass
+@dataclass(slots=True)
 class CommandRun:
     command: List[str]
     hint: str
     exit_code: int
-    output: List[str]
+    results: List[Tuple[str, str]]  # (test_name, status_key)
 
 
 def gather_integration_modules() -> Dict[str, str]:
@@ -120,13 +132,14 @@ def gather_integration_modules() -> Dict[str, str]:
         if path.stem == "common":
             continue
         try:
-            text = path.read_text(encoding="utf-8")
+            # Only ASCII markers are searched for, so skip decoding the file.
+            data = path.read_bytes()
         except OSError:
             continue
         # Most ROM-based tests call `rom_path` to locate the test ROMs.
         # As a safe fallback, treat any test whose filename mentions
         # "interrupt_time" or other known blargg suites as a ROM test.
-        if "rom_path" in text:
+        if b"rom_path" in data:
             category = "rom"
         elif "interrupt_time" in path.stem or "blargg" in path.stem:
             category = "rom"
@@ -155,70 +168,212 @@ def build_test_commands(integration_modules: Dict[str, str]) -> List[Tuple[List[
     return commands
 
 
-def run_command(cmd: List[str]) -> Tuple[int, List[str]]:
-    print(f"\n=== Running: {' '.join(cmd)} ===")
-    sys.stdout.flush()
+def parse_test_result(line: str) -> Optional[Tuple[str, str]]:
+    """Return `(test_name, status_key)` if `line` is a cargo test result line.
+
+    Accepts `test <name> ... <status>` optionally followed by a parenthesised
+    detail such as `(1234 ns/iter)`; anything else after the status (e.g.
+    `ignored, needs roms`) is not a result line.
+    """
+    # Most cargo output is compiler noise; reject it before any real parsing.
+    if not line.startswith("test "):
+        if not line[:1].isspace():
+            return None
+        line = line.lstrip()
+        if not line[4:5].isspace() or not line.startswith("test"):
+            return None
+    sep = line.find(" ... ", 4)
+    if sep < 0:
+        return None
+    name = line[5:sep].strip()
+    status, _, detail = line[sep + 5 :].strip().partition(" ")
+    status_key = STATUS_KEYS.get(status)
+    if not name or status_key is None:
+        return None
+    detail = detail.lstrip()
+    # Only a single parenthesised detail may follow the status.
+    if detail:
+        closing = detail.find(")")
+        if detail[0] != "(" or closing != len(detail) - 1:
+            return None
+    return name, status_key
+
+
+class RunningCommand:
+    """A started test command whose output is collected as it is read.
+
+    Result lines are parsed as they arrive, so only the parsed results are
+    kept rather than the whole (mostly compiler) output. With `stream`,
+    output is echoed as it arrives. Otherwise it is printed as one block once
+    the command exits, so parallel commands don't interleave.
+    """
+
+    def __init__(self, cmd: List[str], hint: str, stream: bool) -> None:
+        self.cmd = cmd
+        self.hint = hint
+        self.stream = stream
+        self.banner = f"\n=== Running: {' '.join(cmd)} ===\n"
+        if stream:
+            print(self.banner, end="")
+            sys.stdout.flush()
+        # Flushing every block keeps a terminal live; redirected output can
+        # be left to the buffer and written in larger pieces.
+        self.live = stream and sys.stdout.isatty()
+        self.results: List[Tuple[str, str]] = []
+        self.output = bytearray()
+        self.pending = b""
+        self.process = subprocess.Popen(
+            cmd,
+            cwd=REPO_ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        assert self.process.stdout is not None
+        self.fd = self.process.stdout.fileno()
+
+    def _scan(self, lines: Iterable[bytes]) -> None:
+        for line in lines:
+            # Only decode lines that could be results; see parse_test_result.
+            if line.startswith(b"test ") or line[:1].isspace():
+                result = parse_test_result(line.decode("utf-8", "replace"))
+                if result:
+                    self.results.append(result)
+
+    def feed(self, chunk: bytes) -> None:
+        if self.stream:
+            sys.stdout.buffer.write(chunk)
+            if self.live:
+                sys.stdout.buffer.flush()
+        else:
+            self.output += chunk
+        lines = (self.pending + chunk).split(b"\n")
+        self.pending = lines.pop()
+        self._scan(lines)
+
+    def finish(self) -> CommandRun:
+        """Wait for the command after its output has hit EOF."""
+        self._scan((self.pending,))
+        self.pending = b""
+        assert self.process.stdout is not None
+        self.process.stdout.close()
+        exit_code = self.process.wait()
+        with _PRINT_LOCK:
+            if not self.stream:
+                sys.stdout.write(self.banner)
+                sys.stdout.flush()
+                sys.stdout.buffer.write(self.output)
+            sys.stdout.buffer.flush()
+        return CommandRun(
+            command=self.cmd,
+            hint=self.hint,
+            exit_code=exit_code,
+            results=self.results,
+        )
 
-    output_lines: List[str] = []
-    process = subprocess.Popen(
-        cmd,
-        cwd=REPO_ROOT,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        bufsize=1,
-    )
 
-    assert process.stdout is not None
-    for line in process.stdout:
-        print(line, end="")
-        output_lines.append(line)
-    return_code = process.wait()
-    return return_code, output_lines
+def drain_command(cmd: List[str], hint: str, stream: bool) -> CommandRun:
+    """Run one command to completion, blocking on its pipe."""
+    command = RunningCommand(cmd, hint, stream)
+    while chunk := os.read(command.fd, READ_SIZE):
+        command.feed(chunk)
+    return command.finish()
+
 
+def _run_with_threads(
+    commands: List[Tuple[List[str], str]], jobs: int, stream: bool
+) -> List[CommandRun]:
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(drain_command, cmd, hint, stream)
+            for cmd, hint in commands
+        ]
+        return [future.result() for future in futures]
+
+
+def _run_with_selector(
+    commands: List[Tuple[List[str], str]], jobs: int, stream: bool
+) -> List[CommandRun]:
+    runs: List[Optional[CommandRun]] = [None] * len(commands)
+    queued = deque(enumerate(commands))
+    running = 0
+    with selectors.DefaultSelector() as selector:
+        while queued or running:
+            while queued and running < jobs:
+                index, (cmd, hint) = queued.popleft()
+                command = RunningCommand(cmd, hint, stream)
+                selector.register(
+                    command.fd, selectors.EVENT_READ, (index, command)
+                )
+                running += 1
+            for key, _ in selector.select():
+                index, command = key.data
+                chunk = os.read(key.fd, READ_SIZE)
+                if chunk:
+                    command.feed(chunk)
+                    continue
+                selector.unregister(key.fd)
+                runs[index] = command.finish()
+                running -= 1
+    return runs
+
+
+def run_cargo_tests(
+    commands: List[Tuple[List[str], str]], jobs: int = 1
+) -> Tuple[int, List[CommandRun]]:
+    """Run the test commands, up to `jobs` at a time.
+
+    The commands are independent and almost all of their time is spent in
+    cargo and the test binaries, so running them concurrently cuts the
+    wall-clock time roughly by the job count. Where pipes can be selected on,
+    all of them are drained from this one thread, so each wakeup services
+    every pipe that has output. Results keep command order.
+    """
+    jobs = max(1, min(jobs, len(commands)))
+    stream = jobs == 1
+
+    # Windows cannot select on pipes, so it keeps a reader thread per command.
+    if sys.platform == "win32" or jobs == 1:
+        runs = _run_with_threads(commands, jobs, stream)
+    else:
+        runs = _run_with_selector(commands, jobs, stream)
+
+    return combined_exit_code(runs), runs
 
-def run_cargo_tests(commands: List[Tuple[List[str], str]]) -> Tuple[int, List[CommandRun]]:
-    runs: List[CommandRun] = []
+
+def combined_exit_code(runs: Iterable[CommandRun]) -> int:
     overall_exit = 0
-    for cmd, hint in commands:
-        code, output = run_command(cmd)
-        runs.append(CommandRun(command=cmd, hint=hint, exit_code=code, output=output))
-        if code != 0:
-            overall_exit = code
-    return overall_exit, runs
-
-
-def normalize_status(raw_status: str) -> str:
-    status = raw_status.strip().upper()
-    if status == "OK":
-        return "passed"
-    if status == "FAILED":
-        return "failed"
-    if status == "IGNORED":
-        return "ignored"
-    if status == "MEASURED":
-        return "measured"
-    return "other"
+    for run in runs:
+        if run.exit_code != 0:
+            overall_exit = run.exit_code
+    return overall_exit
+
+
+def is_rom_suite(hint: str, integration_modules: Dict[str, str]) -> bool:
+    """Return whether the command with `hint` runs a ROM test suite."""
+    kind, _, target = hint.partition(":")
+    if kind != "test":
+        return False
+    # gambatte is always run, even when it isn't discovered as a module.
+    return target == "gambatte" or integration_modules.get(target) == "rom"
 
 
 def collect_test_results(runs: Iterable[CommandRun]) -> Dict[str, Tuple[str, str]]:
     results: Dict[str, Tuple[str, str]] = {}
+    conflicts: List[Tuple[str, str, str]] = []
     for run in runs:
-        for raw_line in run.output:
-            line = raw_line.strip()
-            match = TEST_RESULT_RE.match(line)
-            if not match:
-                continue
-            test_name = match.group("name").strip()
-            raw_status = match.group("status")
-            status_key = normalize_status(raw_status)
+        for test_name, status_key in run.results:
             previous = results.get(test_name)
             if previous and previous[0] != status_key:
-                print(
-                    f"Warning: conflicting results for {test_name}: {previous[0]} vs {status_key}",
-                    file=sys.stderr,
-                )
+                conflicts.append((test_name, previous[0], status_key))
             results[test_name] = (status_key, run.hint)
+    if conflicts:
+        sys.stderr.write(
+            "".join(
+                f"Warning: conflicting results for {name}: "
+                f"{previous} vs {current}\n"
+                for name, previous, current in conflicts
+            )
+        )
     return results
 
 
@@ -236,97 +391,126 @@ def categorize_tests(
 
     rom_modules = {name for name, cat in integration_modules.items() if cat == "rom"}
     integration_only = set(integration_modules)
+    doc_tests = categories["Doc Tests"]
+    unit_tests = categories["Unit Tests"]
+
+    def category_for(module_name: str) -> CategorySummary:
+        if module_name in rom_modules:
+            return categories["ROM Test Suites"]
+        if module_name in integration_only:
+            return categories["Integration Tests"]
+        return unit_tests
+
+    def add_doc(full_name: str, status_key: str) -> None:
+        doc_tests.add(full_name.partition(" - ")[0], full_name, status_key)
+
+    def add_unit(full_name: str, status_key: str) -> None:
+        if full_name.startswith("src/"):
+            add_doc(full_name, status_key)
+        else:
+            module_name = full_name.partition("::tests::")[0]
+            unit_tests.add(module_name, full_name, status_key)
 
-    for full_name, (status_key, hint) in tests.items():
-        if hint == "doc" or full_name.startswith("src/"):
-            module_name = full_name.split(" - ", 1)[0]
-            categories["Doc Tests"].add(module_name, full_name, status_key)
-            continue
-
-        if hint == "lib" or hint.startswith("bin:") or "::tests::" in full_name:
-            module_name = full_name.split("::tests::", 1)[0]
-            categories["Unit Tests"].add(module_name, full_name, status_key)
-            continue
+    def add_target(target: str) -> Callable[[str, str], None]:
+        category = category_for(target)
 
-        if hint.startswith("test:"):
-            target = hint.split(":", 1)[1]
-            if target in rom_modules:
-                categories["ROM Test Suites"].add(target, full_name, status_key)
-            elif target in integration_only:
-                categories["Integration Tests"].add(target, full_name, status_key)
+        def add(full_name: str, status_key: str) -> None:
+            if full_name.startswith("src/"):
+                add_doc(full_name, status_key)
+            elif "::tests::" in full_name:
+                add_unit(full_name, status_key)
             else:
-                categories["Unit Tests"].add(target, full_name, status_key)
-            continue
+                category.add(target, full_name, status_key)
 
-        primary = full_name.split("::", 1)[0]
-        if primary in rom_modules:
-            categories["ROM Test Suites"].add(primary, full_name, status_key)
-        elif primary in integration_only:
-            categories["Integration Tests"].add(primary, full_name, status_key)
+        return add
+
+    def add_other(full_name: str, status_key: str) -> None:
+        if full_name.startswith("src/"):
+            add_doc(full_name, status_key)
+        elif "::tests::" in full_name:
+            add_unit(full_name, status_key)
         else:
-            categories["Unit Tests"].add(primary, full_name, status_key)
+            primary = full_name.partition("::")[0]
+            category_for(primary).add(primary, full_name, status_key)
+
+    # Where a test lands depends mostly on which command ran it, so resolve
+    # each distinct hint to a handler once instead of re-testing it per test.
+    handlers: Dict[str, Callable[[str, str], None]] = {}
+    for _, hint in tests.values():
+        if hint in handlers:
+            continue
+        if hint == "doc":
+            handlers[hint] = add_doc
+        elif hint == "lib" or hint.startswith("bin:"):
+            handlers[hint] = add_unit
+        elif hint.startswith("test:"):
+            handlers[hint] = add_target(hint.partition(":")[2])
+        else:
+            handlers[hint] = add_other
+
+    for full_name, (status_key, hint) in tests.items():
+        handlers[hint](full_name, status_key)
 
     # Remove empty categories to avoid clutter
     return {name: cat for name, cat in categories.items() if cat.modules}
 
 
-def build_summary_table(categories: Dict[str, CategorySummary]) -> str:
+def build_summary_table(
+    categories: Dict[str, CategorySummary], lines: List[str]
+) -> None:
     headers = ["Category", "Passed", "Failed", "Ignored", "Measured", "Total", "Pass %"]
-    lines = ["| " + " | ".join(headers) + " |", "| " + " | ".join(["---"] * len(headers)) + " |"]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join(["---"] * len(headers)) + " |")
 
-    overall_counts = Counter()
+    overall_counts = dict.fromkeys(STATUS_ORDER, 0)
     for category_name, category in categories.items():
         counts = category.counts
-        total = category.total
-        overall_counts.update(counts)
-        row = [
-            category_name,
-            str(counts.get("passed", 0)),
-            str(counts.get("failed", 0)),
-            str(counts.get("ignored", 0)),
-            str(counts.get("measured", 0)),
-            str(total),
-            f"{category.pass_percentage:.1f}%",
-        ]
-        lines.append("| " + " | ".join(row) + " |")
+        for status_key, count in counts.items():
+            overall_counts[status_key] += count
+        lines.append(
+            f"| {category_name} | {counts['passed']} | {counts['failed']} "
+            f"| {counts['ignored']} | {counts['measured']} "
+            f"| {category.total} | {category.pass_percentage:.1f}% |"
+        )
 
     overall_total = sum(overall_counts.values())
     if overall_total:
-        overall_pass_pct = (overall_counts.get("passed", 0) / overall_total) * 100.0
+        overall_pass_pct = (overall_counts["passed"] / overall_total) * 100.0
     else:
         overall_pass_pct = 0.0
-    overall_row = [
-        "**Overall**",
-        str(overall_counts.get("passed", 0)),
-        str(overall_counts.get("failed", 0)),
-        str(overall_counts.get("ignored", 0)),
-        str(overall_counts.get("measured", 0)),
-        str(overall_total),
-        f"{overall_pass_pct:.1f}%",
-    ]
-    lines.append("| " + " | ".join(overall_row) + " |")
-    return "\n".join(lines)
+    lines.append(
+        f"| **Overall** | {overall_counts['passed']} "
+        f"| {overall_counts['failed']} | {overall_counts['ignored']} "
+        f"| {overall_counts['measured']} | {overall_total} "
+        f"| {overall_pass_pct:.1f}% |"
+    )
 
 
-def format_module_section(module: ModuleSummary) -> str:
+def format_module_section(
+    module: ModuleSummary,
+    lines: List[str],
+    _display: Dict[str, str] = STATUS_DISPLAY,
+    _other: str = STATUS_DISPLAY["other"],
+) -> None:
+    # The display table is bound as a default so the per-test loop only does
+    # local lookups; the underscored parameters are not meant to be passed.
     heading = f"#### {module.name} ({module.passed}/{module.total} passing, {module.pass_percentage:.1f}%)"
-    lines = [heading, "", "| Test | Result |", "| --- | --- |"]
-    for test_name, status_key in sorted(module.tests, key=lambda item: (STATUS_ORDER.get(item[1], 99), item[0])):
-        display = STATUS_DISPLAY.get(status_key, STATUS_DISPLAY["other"])
-        lines.append(f"| `{test_name}` | {display} |")
-    lines.append("")
-    return "\n".join(lines)
-
-
-def build_category_sections(categories: Dict[str, CategorySummary]) -> str:
-    sections: List[str] = []
-    for category_name, category in categories.items():
-        sections.append(f"### {category_name}\n")
+    lines.extend((heading, "", "| Test | Result |", "| --- | --- |"))
+    for _, test_name, status_key in module.tests:
+        lines.append(f"| `{test_name}` | {_display.get(status_key, _other)} |")
+
+
+def build_category_sections(
+    categories: Dict[str, CategorySummary], lines: List[str]
+) -> None:
+    for index, (category_name, category) in enumerate(categories.items()):
+        # Modules are separated by one blank line, categories by two.
+        if index:
+            lines.append("")
+        lines.extend(("", f"### {category_name}"))
         for module_name in sorted(category.modules):
-            module = category.modules[module_name]
-            sections.append(format_module_section(module))
-        sections.append("")
-    return "\n".join(sections).strip() + "\n"
+            lines.append("")
+            format_module_section(category.modules[module_name], lines)
 
 
 def render_markdown(
@@ -334,30 +518,69 @@ def render_markdown(
     commands: List[List[str]],
     cargo_exit_code: int,
 ) -> str:
-    summary_table = build_summary_table(categories)
-    category_sections = build_category_sections(categories)
-
-    command_lines = "\n".join(f"- `{' '.join(cmd)}`" for cmd in commands)
-
-    markdown_parts = [
-        "# Test Status\n",
-        "_Generated by `scripts/update_test_status.py`_\n",
-        "\nCommands executed:",
-        command_lines,
-        f"\n\nCombined exit code: {cargo_exit_code}\n",
-        "\n## Overall Summary\n",
-        summary_table,
-        "\n## Detailed Results\n",
-        category_sections,
+    # Every helper appends to this one list of lines, which is joined once.
+    lines = [
+        "# Test Status",
+        "",
+        "_Generated by `scripts/update_test_status.py`_",
+        "",
+        "",
+        "Commands executed:",
     ]
-    return "\n".join(markdown_parts).strip() + "\n"
+    lines.extend(f"- `{' '.join(cmd)}`" for cmd in commands)
+    lines.extend(("", "", f"Combined exit code: {cargo_exit_code}", "", ""))
+    lines.extend(("## Overall Summary", ""))
+    build_summary_table(categories, lines)
+    lines.extend(("", "## Detailed Results"))
+    build_category_sections(categories, lines)
+    return "\n".join(lines) + "\n"
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of cargo test commands to run at once "
+        "(default: CPU count). With 1, command output is streamed live.",
+    )
+    return parser.parse_args(argv)
 
 
-def main() -> int:
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv)
     os.chdir(REPO_ROOT)
+    jobs = args.jobs
+
     integration_modules = gather_integration_modules()
     commands_with_hints = build_test_commands(integration_modules)
-    cargo_exit_code, runs = run_cargo_tests(commands_with_hints)
+
+    # Every ROM test binary fetches any missing ROMs into test_roms/ through
+    # fixed temporary file names, so concurrent first runs would collide.
+    # Whether the fetch already finished can't be told reliably from here
+    # (extraction creates directories partway through), so one ROM suite
+    # always runs alone before the rest run concurrently.
+    warmup: Optional[int] = None
+    if jobs > 1:
+        warmup = next(
+            (
+                index
+                for index, (_, hint) in enumerate(commands_with_hints)
+                if is_rom_suite(hint, integration_modules)
+            ),
+            None,
+        )
+
+    if warmup is None:
+        cargo_exit_code, runs = run_cargo_tests(commands_with_hints, jobs)
+    else:
+        _, first = run_cargo_tests([commands_with_hints[warmup]], 1)
+        rest = commands_with_hints[:warmup] + commands_with_hints[warmup + 1 :]
+        _, others = run_cargo_tests(rest, jobs)
+        runs = others[:warmup] + first + others[warmup:]
+        cargo_exit_code = combined_exit_code(runs)
     results = collect_test_results(runs)
 
     if not results:
@@ -369,8 +592,17 @@ def main() -> int:
         [run.command for run in runs],
         cargo_exit_code,
     )
-    TEST_STATUS_FILE.write_text(markdown, encoding="utf-8")
-    print(f"\nUpdated {TEST_STATUS_FILE.relative_to(REPO_ROOT)}")
+    payload = markdown.encode("utf-8")
+    try:
+        existing = TEST_STATUS_FILE.read_bytes()
+    except FileNotFoundError:
+        existing = None
+    # Leave the file (and its mtime) alone when nothing changed.
+    if existing == payload:
+        print(f"\n{TEST_STATUS_FILE.relative_to(REPO_ROOT)} is unchanged")
+    else:
+        TEST_STATUS_FILE.write_bytes(payload)
+        print(f"\nUpdated {TEST_STATUS_FILE.relative_to(REPO_ROOT)}")
     if cargo_exit_code != 0:
         print(
             "Note: one or more test commands exited with a non-zero status.",